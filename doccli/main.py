@@ -2,31 +2,49 @@
 import os
 import sqlite3
 import datetime
+import asyncio
+import atexit
 import click
-from openai import OpenAI
+import csv
 import json
+import re
+import errno
 import getpass
 import hashlib
+import hmac
+import io
 import functools
 import shutil
+import tempfile
+from pathlib import Path
 
-# PDF text extraction
-from pdfminer.high_level import extract_text
+# openai and pdfminer are imported lazily inside the commands that use
+# them: together they add a few hundred ms of import time that short
+# commands like logout or list-docs should not pay.
 
 # ——— Configuration ———
 DB_PATH = "metadata.db"
-DOCS_DIR = "docs/"
-QUIZ_DIR = "quizzes/"
-ANS_KEY_DIR = "answer_keys/"
-STUDENT_RESP_DIR = "student_responses/"
+# Path objects are built once here; the commands join with / instead of
+# re-running os.path.join/splitext string work on every call.
+DOCS_DIR = Path("docs")
+QUIZ_DIR = Path("quizzes")
+ANS_KEY_DIR = Path("answer_keys")
+STUDENT_RESP_DIR = Path("student_responses")
+TEXT_CACHE_DIR = DOCS_DIR / ".cache"
 SESSION_FILE = os.path.expanduser("~/.doccli_session")      # Where to persist current session. Store { user_id, name, role } here.
 
 HELP_TEXT_WIDTH = 150
 CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'], max_content_width=HELP_TEXT_WIDTH)
 
+# Bumped whenever init_db gains new schema statements (tables, indexes,
+# ALTERs); stored in the DB via PRAGMA user_version so existing databases
+# are migrated exactly once instead of re-running DDL on every command.
+SCHEMA_VERSION = 3
+
+
 # ——— Helpers ———
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_db_connection()
     c = conn.cursor()
     c.execute("""
     CREATE TABLE IF NOT EXISTS documents (
@@ -35,8 +53,13 @@ def init_db():
       owner TEXT,
       timestamp TEXT,
       type TEXT,
-      summary TEXT
+      summary TEXT,
+      content_hash TEXT
     )""")
+    # databases created before the content_hash column existed
+    doc_cols = [row[1] for row in c.execute("PRAGMA table_info(documents)")]
+    if 'content_hash' not in doc_cols:
+        c.execute("ALTER TABLE documents ADD COLUMN content_hash TEXT")
     # Users table
     c.execute("""
     CREATE TABLE IF NOT EXISTS users (
@@ -44,47 +67,477 @@ def init_db():
       name TEXT,
       email TEXT UNIQUE,
       role TEXT,
-      password_hash TEXT
+      password_hash TEXT,
+      salt TEXT
     )""")
+    # databases created before the salt column existed
+    user_cols = [row[1] for row in c.execute("PRAGMA table_info(users)")]
+    if 'salt' not in user_cols:
+        c.execute("ALTER TABLE users ADD COLUMN salt TEXT")
+    # Batch API jobs submitted via batch-summarize, so results can be
+    # fetched in a later invocation
+    c.execute("""
+    CREATE TABLE IF NOT EXISTS batches (
+      id INTEGER PRIMARY KEY,
+      batch_id TEXT UNIQUE,
+      kind TEXT,
+      status TEXT,
+      created TEXT
+    )""")
+    # Index the columns delete-doc and owner-scoped listings filter on,
+    # so lookups stay O(log N) as the documents table grows.
+    c.execute("CREATE INDEX IF NOT EXISTS idx_docs_name ON documents(name)")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_docs_owner ON documents(owner)")
+    c.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
     conn.commit()
-    conn.close()
 
 
+def ensure_initialized():
+    """Create directories and schema on first run; afterwards each command
+    pays one stat plus a PRAGMA read instead of four makedirs and the full
+    batch of CREATE statements."""
+    if not os.path.exists(DB_PATH):
+        for d in (DOCS_DIR, QUIZ_DIR, ANS_KEY_DIR, STUDENT_RESP_DIR):
+            os.makedirs(d, exist_ok=True)
+        init_db()
+        return
+    conn = get_db_connection()
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        init_db()
+
+
+# One connection per process: every command used to open/close its own
+# connection (an fsync per commit in rollback-journal mode). WAL avoids
+# double-writing pages and synchronous=NORMAL drops one fsync per commit.
+@functools.lru_cache(maxsize=None)
 def get_db_connection():
-    return sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    atexit.register(conn.close)
+    return conn
+
+
+def reset_conn():
+    """Close and forget the cached connection.
+
+    For callers (tests, fixtures) that swap or delete the database file
+    mid-process; closing an already-closed connection at exit is harmless.
+    """
+    if get_db_connection.cache_info().currsize:
+        get_db_connection().close()
+    get_db_connection.cache_clear()
 
-def save_metadata(name, owner, doc_type):
+
+def save_metadata(name, owner, doc_type, content_hash=None):
+    """Record one document; thin wrapper over the batched insert path so
+    there is a single INSERT statement to maintain."""
+    save_metadata_many([
+        (name, owner, datetime.datetime.utcnow().isoformat(), doc_type, content_hash)
+    ])
+
+
+def save_metadata_many(rows):
+    """Insert many (name, owner, timestamp, type, content_hash) rows in one
+    transaction.
+
+    One BEGIN/COMMIT pair amortizes a single fsync over all rows instead of
+    paying one per insert.
+    """
     conn = get_db_connection()
-    c = conn.cursor()
-    c.execute(
-      "INSERT INTO documents (name, owner, timestamp, type) VALUES (?, ?, ?, ?)",
-      (name, owner, datetime.datetime.utcnow().isoformat(), doc_type)
-    )
-    conn.commit()
-    conn.close()
+    conn.execute("BEGIN")
+    try:
+        conn.executemany(
+          "INSERT INTO documents (name, owner, timestamp, type, content_hash) VALUES (?, ?, ?, ?, ?)",
+          rows
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def content_hash(data):
+    """Short content digest used for text-cache keys and dedup in documents."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _read_file_bytes(path):
+    """Read a whole file into memory with a sequential readahead hint, so
+    the kernel issues large async reads instead of reacting to the parser's
+    many small ones. All PDF backends then parse from these bytes (via
+    BytesIO where a file-like is required) rather than re-reading the
+    file themselves."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        size = os.fstat(fd).st_size
+        chunks = []
+        while size > 0:
+            chunk = os.read(fd, size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            size -= len(chunk)
+        return chunks[0] if len(chunks) == 1 else b"".join(chunks)
+    finally:
+        os.close(fd)
+
+
+# Extraction is CPU-bound, so documents with at least this many pages are
+# split across a process pool; smaller ones aren't worth the fork cost.
+_PARALLEL_PAGE_THRESHOLD = 4
+
+
+def _extract_page(args):
+    """Process-pool worker: extract one page, opening its own reader."""
+    path, index = args
+    from pypdf import PdfReader
+    return PdfReader(path).pages[index].extract_text() or ""
+
+
+def _extract_pdf(data, path=None):
+    """Extract text from in-memory PDF bytes.
+
+    Backends in speed order: pypdfium2 if installed, then pypdf (the
+    default dependency, several times faster than pdfminer), with pdfminer
+    as the last resort for PDFs the others return nothing for. When a path
+    is given, multi-page documents are extracted page-parallel across a
+    process pool.
+    """
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        pass
+    else:
+        pdf = pdfium.PdfDocument(data)
+        try:
+            text = "\n".join(page.get_textpage().get_text_range() for page in pdf)
+        finally:
+            pdf.close()
+        if text.strip():
+            return text
+
+    try:
+        from pypdf import PdfReader
+        reader = PdfReader(io.BytesIO(data))
+        n_pages = len(reader.pages)
+        if path is not None and n_pages >= _PARALLEL_PAGE_THRESHOLD:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor() as ex:
+                pages = ex.map(_extract_page,
+                               [(os.fspath(path), i) for i in range(n_pages)])
+                text = "\n".join(pages)
+        else:
+            text = "\n".join(page.extract_text() or "" for page in reader.pages)
+        if text.strip():
+            return text
+    except Exception:
+        pass
+
+    from pdfminer.high_level import extract_text
+    return extract_text(io.BytesIO(data))
 
 
 def get_text(path):
-    """Extract plain text from documents (supports .txt and .pdf)."""
+    """Extract plain text from documents (supports .txt and .pdf).
+
+    Extracted PDF text is cached in docs/.cache keyed by a digest of the
+    file contents, so repeated summarize/quiz runs on an unchanged file
+    (or an identical copy under another name) cost one read instead of a
+    full re-parse.
+    """
     ext = os.path.splitext(path)[1].lower()
     if ext == ".pdf":
-        return extract_text(path)
+        data = _read_file_bytes(path)
+        cache_path = TEXT_CACHE_DIR / f"{content_hash(data)}.txt"
+        if os.path.exists(cache_path):
+            with open(cache_path, 'rb') as f:
+                return f.read().decode('utf-8')
+        text = _extract_pdf(data, path=path)
+        os.makedirs(TEXT_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, cache_path)
+        return text
+    else:
+        # read_bytes + one decode skips the BufferedReader/TextIOWrapper
+        # layering that open() builds for a file we read exactly once
+        return Path(path).read_bytes().decode('utf-8', errors='ignore')
+
+
+def _copy_file(src, dest):
+    """Copy src to dest without leaving the kernel.
+
+    os.sendfile moves the bytes kernel-side instead of looping 64KB
+    userspace buffers like shutil.copy2, and the fadvise hint tells the
+    kernel to read ahead sequentially. Falls back to shutil.copy2 on
+    platforms without sendfile.
+    """
+    if not hasattr(os, 'sendfile'):
+        shutil.copy2(src, dest)
+        return
+    src_fd = os.open(src, os.O_RDONLY)
+    try:
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(src_fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        dst_fd = os.open(dest, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            while os.sendfile(dst_fd, src_fd, None, 1 << 20):
+                pass
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+
+
+def _save_quiz(docname, response_text):
+    """Split a quiz response into questions and answer key and write both files."""
+    if "Answer Key" in response_text:
+        questions_part, answer_key_part = response_text.split("Answer Key", 1)
+        answer_key_part = "Answer Key" + answer_key_part
     else:
-        with open(path, encoding='utf-8', errors='ignore') as f:
-            return f.read()
+        questions_part = response_text
+        answer_key_part = ""
+
+    # Write the quiz questions
+    quiz_file = QUIZ_DIR / f"{docname}_quiz.txt"
+    with open(quiz_file, "w", encoding="utf-8") as f:
+        f.write(questions_part.strip())
+        f.write("\n\nAnswer files should be in the format:\nFirst Last, A, B, C, D")
+    click.echo(f"Quiz saved to {quiz_file}")
+
+    # Write the answer key (if present)
+    if answer_key_part:
+        ans_file = ANS_KEY_DIR / f"{docname}_answer_key.txt"
+        with open(ans_file, "w", encoding="utf-8") as f:
+            f.write(answer_key_part.strip())
+        click.echo(f"Answer key saved to {ans_file}")
+
+
+# Token budget per chunk when a document is too big for one prompt; keeps
+# each request well inside the model context window.
+MAX_PROMPT_TOKENS = 6000
+_CHARS_PER_TOKEN = 4  # estimate used when tiktoken is unavailable
+
+
+@functools.lru_cache(maxsize=1)
+def _get_encoder():
+    # tiktoken is optional: with it chunk budgets are exact token counts,
+    # without it a chars/4 estimate is close enough for chunk sizing
+    try:
+        import tiktoken
+        return tiktoken.encoding_for_model("gpt-4o-mini")
+    except Exception:
+        return None
+
+
+def _token_len(text):
+    enc = _get_encoder()
+    if enc is not None:
+        return len(enc.encode(text))
+    return len(text) // _CHARS_PER_TOKEN
+
+
+def chunk_text(text, max_tokens=MAX_PROMPT_TOKENS):
+    """Split text into chunks under a token budget at paragraph boundaries.
+
+    Returns [text] unchanged when it already fits, so callers can keep the
+    single-request path for normal-sized documents.
+    """
+    if _token_len(text) <= max_tokens:
+        return [text]
+    max_chars = max_tokens * _CHARS_PER_TOKEN
+    chunks = []
+    current = []
+    size = 0
+    for para in text.split("\n\n"):
+        para_tokens = _token_len(para)
+        # hard-split a single paragraph that is itself over budget
+        while para_tokens > max_tokens:
+            if current:
+                chunks.append("\n\n".join(current))
+                current, size = [], 0
+            chunks.append(para[:max_chars])
+            para = para[max_chars:]
+            para_tokens = _token_len(para)
+        if size + para_tokens > max_tokens and current:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(para)
+        size += para_tokens + 1
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def _batched(seq, size):
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+def _doc_registered(docname):
+    """Existence check against the indexed documents table: an O(log N)
+    probe of pages that are usually cached, instead of a stat(2)."""
+    conn = get_db_connection()
+    row = conn.execute(
+        "SELECT 1 FROM documents WHERE name = ? LIMIT 1", (docname,)
+    ).fetchone()
+    return row is not None
+
+
+def _load_docs(docnames):
+    """Resolve docnames to (docname, text) pairs, or None if any is missing."""
+    docs = []
+    for docname in docnames:
+        path = DOCS_DIR / docname
+        # uploaded documents answer from the DB; files dropped into docs/
+        # by hand still pass via the filesystem check
+        if not _doc_registered(docname) and not os.path.exists(path):
+            click.echo(f"Document not found: {docname}. Are you missing .pdf or .txt?")
+            return None
+        try:
+            docs.append((docname, get_text(path)))
+        except FileNotFoundError:
+            click.echo(f"Document {docname} is registered but missing from {DOCS_DIR}/.")
+            return None
+    return docs
+
+
+def _parse_doc_map(output_text):
+    """Parse a JSON object mapping doc_id -> text, tolerating markdown fences."""
+    cleaned = output_text.strip()
+    if cleaned.startswith("```"):
+        cleaned = cleaned.strip('`')
+        # drop a leading language tag like "json"
+        if '\n' in cleaned:
+            cleaned = cleaned.split('\n', 1)[1]
+    return json.loads(cleaned)
+
+
+# One OpenAI client per process: constructing it builds an httpx client,
+# TLS context, and connection pool, and reusing it keeps the keep-alive
+# HTTPS connection to the API across commands in the same process.
+_client = None
+
+def get_client():
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = OpenAI(
+			# This is the default and can be omitted
+			api_key=os.environ.get("OPENAI_API_KEY"),
+		)
+        atexit.register(_client.close)
+    return _client
+
+
+def _stream_response(client, prompt):
+    """Stream a response, echoing text deltas as they arrive.
+
+    Total generation time is unchanged, but the user starts reading at
+    time-to-first-token instead of waiting for the whole response. Returns
+    the full output text.
+    """
+    parts = []
+    with client.responses.stream(model="gpt-4o-mini", input=prompt) as stream:
+        for event in stream:
+            if event.type == "response.output_text.delta":
+                click.echo(event.delta, nl=False)
+                parts.append(event.delta)
+    click.echo()
+    return "".join(parts)
+
+
+# Run one OpenAI request per document concurrently; the calls are
+# network-latency-bound, so N documents cost ~1 round-trip instead of N.
+# Concurrency is capped to stay under API rate limits.
+def _run_concurrently(prompts, max_concurrent=8):
+    """prompts: list of (docname, prompt). Returns list of (docname, output_text)
+    in input order. Transient API errors (429/5xx) are retried up to 3
+    attempts with exponential backoff."""
+    from openai import AsyncOpenAI
+
+    async def run():
+        client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+        sem = asyncio.Semaphore(max_concurrent)
+
+        async def one(docname, prompt):
+            async with sem:
+                for attempt in range(3):
+                    try:
+                        response = await client.responses.create(
+                            model="gpt-4o-mini",
+                            input=prompt,
+                        )
+                        return docname, response.output_text
+                    except Exception as exc:
+                        status = getattr(exc, 'status_code', None)
+                        retryable = status == 429 or (status is not None and status >= 500)
+                        if attempt == 2 or not retryable:
+                            raise
+                        await asyncio.sleep(2 ** attempt)
+
+        try:
+            return await asyncio.gather(*(one(d, p) for d, p in prompts))
+        finally:
+            await client.close()
+
+    return asyncio.run(run())
+
+
+def _move_file(src, dest):
+    """Move src to dest: a zero-copy rename(2) on the same filesystem,
+    falling back to an in-kernel copy plus unlink across devices."""
+    try:
+        os.rename(src, dest)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        _copy_file(src, dest)
+        os.unlink(src)
+
+
+# Iteration count for PBKDF2; the loop runs inside OpenSSL (SHA-NI
+# accelerated where the CPU supports it), so the cost is bounded and
+# deliberate rather than interpreter overhead.
+PBKDF2_ITERATIONS = 200_000
 
+def hash_password(password: str, salt: str) -> str:
+    """Derive a password hash with PBKDF2-HMAC-SHA256 and a per-user salt."""
+    return hashlib.pbkdf2_hmac(
+        'sha256', password.encode('utf-8'), bytes.fromhex(salt), PBKDF2_ITERATIONS
+    ).hex()
 
-def hash_password(password: str) -> str:
+
+def _legacy_hash_password(password: str) -> str:
+    # single-round SHA-256 used before salted PBKDF2; kept only to verify
+    # (and then upgrade) accounts created under the old scheme
     return hashlib.sha256(password.encode('utf-8')).hexdigest()
 
 
-# Check if session file exists and load it
+# Read and parse the session file once per process; the command filter in
+# DocCLI consults the session repeatedly, and without the cache each check
+# costs a stat + open + JSON parse.
+@functools.lru_cache(maxsize=1)
+def _read_session():
+    try:
+        with open(SESSION_FILE, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+# Check if a session exists and load it
 def load_session():
-    if not os.path.exists(SESSION_FILE):
+    session = _read_session()
+    if session is None:
         click.echo("Not logged in. Please `login` first.")
         raise click.Abort()
-    with open(SESSION_FILE, 'r') as f:
-        return json.load(f)
+    return session
 
 
 # Decorator: Wrap CLI commands to require login (no extra args)
@@ -99,7 +552,7 @@ def require_login(func):
 
 
 def is_logged_in():
-    return os.path.exists(SESSION_FILE)
+    return _read_session() is not None
 
 
 # Decorator factory: Check if user's role is in the allow list (no extra args)
@@ -120,69 +573,72 @@ def require_role(roles):
 
 # ——— Custom Group to Filter Commands ———
 class DocCLI(click.Group):
-    def list_commands(self, ctx):
-        all_cmds = super().list_commands(ctx)
-        filtered = []
-        logged_in = is_logged_in()
-        role = None
-        if logged_in:
-            role = load_session().get('role')
-
-        for name in all_cmds:
-            cmd = self.commands[name]
-            cb  = cmd.callback
-
-            # -- once logged in, hide login for everyone
-            if logged_in and name == "login":
-                continue
-            # -- once logged in, hide register for non-admins, but allow admins
-            if logged_in and name == "register" and role != "admin":
-                continue
-            # -- always hide logout when logged out
-            if not logged_in and name == "logout":
-                continue
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # filtered command lists keyed by (logged_in, role); click calls
+        # list_commands several times per dispatch and the session cannot
+        # change mid-invocation, so compute the filter once per state
+        self._filtered = {}
+        # per-command (requires_login, roles) pairs, resolved from the
+        # callback once instead of via getattr on every filter pass
+        self._acl = {}
+
+    def _acl_for(self, name, cmd):
+        acl = self._acl.get(name)
+        if acl is None:
+            cb = cmd.callback
+            acl = (getattr(cb, 'requires_login', False), getattr(cb, 'roles', None))
+            self._acl[name] = acl
+        return acl
+
+    def _session_state(self):
+        session = _read_session()
+        logged_in = session is not None
+        role = session.get('role') if logged_in else None
+        return logged_in, role
+
+    def _allowed(self, name, cmd, logged_in, role):
+        requires_login, roles_required = self._acl_for(name, cmd)
+
+        # -- once logged in, hide login for everyone
+        if logged_in and name == "login":
+            return False
+        # -- once logged in, hide register for non-admins, but allow admins
+        if logged_in and name == "register" and role != "admin":
+            return False
+        # -- always hide logout when logged out
+        if not logged_in and name == "logout":
+            return False
 
-            # -- hide any command requiring login if not logged in
-            if not logged_in and getattr(cb, 'requires_login', False):
-                continue
+        # -- hide any command requiring login if not logged in
+        if not logged_in and requires_login:
+            return False
 
-            # -- hide any command requiring a role the user doesn't have
-            roles_required = getattr(cb, 'roles', None)
-            if roles_required and role not in roles_required:
-                continue
+        # -- hide any command requiring a role the user doesn't have
+        if roles_required and role not in roles_required:
+            return False
+
+        return True
+
+    def list_commands(self, ctx):
+        logged_in, role = self._session_state()
+        key = (logged_in, role)
+        cached = self._filtered.get(key)
+        if cached is None:
+            cached = [name for name in super().list_commands(ctx)
+                      if self._allowed(name, self.commands[name], logged_in, role)]
+            self._filtered[key] = cached
+        return cached
 
-            filtered.append(name)
-        return filtered
-        
-    
     def get_command(self, ctx, name):
         cmd = super().get_command(ctx, name)
         if not cmd:
             return None
-
-        cb = cmd.callback
-        logged_in = is_logged_in()
-        role = load_session().get('role') if logged_in else None
-
-        # same filters as list_commands:
-        # once logged in, disallow login
-        if logged_in and name == "login":
-            return None
-        # once logged in, disallow register for non-admins
-        if logged_in and name == "register" and role != "admin":
-            return None
-        if not logged_in and name == "logout":
+        logged_in, role = self._session_state()
+        if not self._allowed(name, cmd, logged_in, role):
             return None
-
-        if not logged_in and getattr(cb, 'requires_login', False):
-            return None
-
-        roles_required = getattr(cb, 'roles', None)
-        if roles_required and role not in roles_required:
-            return None
-
         return cmd
-    
+
 
 # ——— CLI Commands ———
 
@@ -190,11 +646,18 @@ class DocCLI(click.Group):
 @click.group(cls=DocCLI, context_settings = CONTEXT_SETTINGS)
 def cli():
     """Document Analyzer CLI"""
+    ensure_initialized()
+
+
+@cli.command()
+def init():
+    """Create (or repair) the data directories and database schema."""
     os.makedirs(DOCS_DIR,         exist_ok=True)
     os.makedirs(QUIZ_DIR,         exist_ok=True)
     os.makedirs(ANS_KEY_DIR,      exist_ok=True)
     os.makedirs(STUDENT_RESP_DIR, exist_ok=True)
     init_db()
+    click.echo("Initialized.")
 
 
 # Register: Prompt and check password. Hash and store user info with unique email.
@@ -210,7 +673,6 @@ def register(name, email, role):
     c = conn.cursor()
     c.execute("SELECT COUNT(*) FROM users WHERE role='admin'")
     admin_count = c.fetchone()[0]
-    conn.close()
 
     # if no admins exist yet, allow ANY role (including 'admin') to self-register
     if admin_count == 0:
@@ -234,7 +696,6 @@ def register(name, email, role):
         c.execute("SELECT COUNT(*) FROM users WHERE role='admin'")
         if c.fetchone()[0] > 0:
             click.echo('An admin already exists. Cannot register another admin.')
-            conn.close()
             return
 
     password = getpass.getpass('Password: ')
@@ -242,18 +703,16 @@ def register(name, email, role):
     if password != confirm:
         click.echo('Passwords do not match.')
         return
-    pwd_hash = hash_password(password)
+    salt = os.urandom(16).hex()
+    pwd_hash = hash_password(password, salt)
     try:
         c.execute(
-            "INSERT INTO users (name,email,role,password_hash) VALUES (?,?,?,?)",
-            (name,email,role,pwd_hash)
+            "INSERT INTO users (name,email,role,password_hash,salt) VALUES (?,?,?,?,?)",
+            (name,email,role,pwd_hash,salt)
         )
-        conn.commit()
         click.echo(f"User {name} ({role}) registered.")
     except sqlite3.IntegrityError:
         click.echo('Error: email already registered.')
-    finally:
-        conn.close()
 
 
 # Login: Look up user by email, check password, and store session info.
@@ -263,17 +722,25 @@ def login(email):
     """Log in as existing user"""
     conn = get_db_connection()
     c = conn.cursor()
-    c.execute("SELECT id,name,role,password_hash FROM users WHERE email=?", (email,))
+    c.execute("SELECT id,name,role,password_hash,salt FROM users WHERE email=?", (email,))
     row = c.fetchone()
-    conn.close()
     if not row:
         click.echo('User not found.')
         return
-    user_id,name,role,pwd_hash = row
+    user_id,name,role,pwd_hash,salt = row
     password = getpass.getpass('Password: ')
-    if hash_password(password) != pwd_hash:
+    if salt:
+        given = hash_password(password, salt)
+    else:
+        given = _legacy_hash_password(password)
+    if not hmac.compare_digest(given, pwd_hash):
         click.echo('Invalid password.')
         return
+    if not salt:
+        # transparently upgrade a pre-salt account to PBKDF2
+        salt = os.urandom(16).hex()
+        c.execute("UPDATE users SET password_hash=?, salt=? WHERE id=?",
+                  (hash_password(password, salt), salt, user_id))
     session = {
     'user_id': user_id,
     'name':    name,
@@ -282,6 +749,7 @@ def login(email):
     }
     with open(SESSION_FILE,'w') as f:
         json.dump(session, f)
+    _read_session.cache_clear()
     click.echo(f"Logged in as {name} ({role}).")
 
 
@@ -291,6 +759,7 @@ def logout():
     """Log out current user"""
     if os.path.exists(SESSION_FILE):
         os.remove(SESSION_FILE)
+        _read_session.cache_clear()
         click.echo('Logged out.')
     else:
         click.echo('Not logged in.')
@@ -300,107 +769,313 @@ def logout():
 @cli.command()
 @require_login
 @require_role(['teacher','admin'])
-@click.argument("file", type=click.Path(exists=True))
-def upload(file):
-    """Upload a document (PDF or txt).  Owner is set to the current user."""
+@click.argument("files", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option("--move", is_flag=True, help="Move files into docs/ instead of copying")
+def upload(files, move):
+    """Upload one or more documents (PDF or txt).  Owner is set to the current user."""
     # load the session now that we're inside the command
     session = load_session()
     owner   = session['email']
 
-    ext = os.path.splitext(file)[1].lower()
-    if ext not in ['.pdf', '.txt']:
-        click.echo("Unsupported file type. Only .pdf and .txt are allowed.")
-        return
+    rows = []
+    for file in files:
+        src = Path(file)
+        ext = src.suffix.lower()
+        if ext not in ['.pdf', '.txt']:
+            click.echo(f"Skipping {file}: only .pdf and .txt are allowed.")
+            continue
 
-    dest = os.path.join(DOCS_DIR, os.path.basename(file))
-    # copy original into docs/ (doesn’t delete the source)
-    shutil.copy2(file, dest)
+        dest = DOCS_DIR / src.name
+        if move:
+            # same-filesystem moves are a free rename(2)
+            _move_file(file, dest)
+        else:
+            # copy original into docs/ (doesn’t delete the source)
+            _copy_file(file, dest)
 
-    # now record with the real owner
-    save_metadata(os.path.basename(file), owner, ext)
-    click.echo(f"Uploaded {dest} (owner: {owner}).")
+        ts = datetime.datetime.utcnow().isoformat()
+        rows.append((src.name, owner, ts, ext, content_hash(_read_file_bytes(dest))))
+        click.echo(f"Uploaded {dest} (owner: {owner}).")
+
+    # record all copied files in one transaction
+    if rows:
+        save_metadata_many(rows)
 
 
 @cli.command()
 @require_login
-@click.argument("docname")
-def summarize(docname):
-    """Generate a summary via OpenAI"""
-    click.echo("Generating summary...")
-    client = OpenAI(
-			# This is the default and can be omitted
-			api_key=os.environ.get("OPENAI_API_KEY"),
-		)
-    
-    path = os.path.join(DOCS_DIR, docname)
-    if not os.path.exists(path):
-        click.echo("Document not found. Are you missing .pdf or .txt?")
+@click.argument("docnames", nargs=-1, required=True)
+@click.option("--batch-size", default=8, help="Documents sent per OpenAI request")
+def summarize(docnames, batch_size):
+    """Generate summaries via OpenAI. Several documents share one request."""
+    docs = _load_docs(docnames)
+    if docs is None:
         return
-    text = get_text(path)
-    prompt = f"Summarize this:\n\n{text}"
-    response = client.responses.create(
-			model="gpt-4o-mini",
-			input=prompt,
-			#temperature=0.6,
-			#max_tokens=1500
-		)
-    response_text = response.output_text
-    click.echo(response_text)
+
+    if len(docs) == 1:
+        client = get_client()
+        click.echo("Generating summary...")
+        docname, text = docs[0]
+        chunks = chunk_text(text)
+        if len(chunks) > 1:
+            # Map-reduce for documents too big for one prompt: summarize each
+            # chunk concurrently, then combine the partial summaries.
+            prompts = [(str(i), f"Summarize this:\n\n{chunk}")
+                       for i, chunk in enumerate(chunks)]
+            partials = [output for _, output in _run_concurrently(prompts)]
+            prompt = ("Combine these partial summaries of one document "
+                      "into a single coherent summary:\n\n" + "\n\n".join(partials))
+        else:
+            prompt = f"Summarize this:\n\n{text}"
+        _stream_response(client, prompt)
+        return
+
+    # Several documents share one structured prompt per batch, and the
+    # batches themselves are dispatched concurrently: N documents cost
+    # roughly one round-trip instead of N.
+    click.echo(f"Generating summaries for {len(docs)} documents...")
+    batches = list(_batched(docs, batch_size))
+    prompts = []
+    for i, batch in enumerate(batches):
+        payload = json.dumps([{"doc_id": name, "text": text} for name, text in batch])
+        prompts.append((str(i), (
+          "Summarize each of the documents in the JSON list below. Respond "
+          "with only a JSON object mapping each \"doc_id\" to its summary.\n\n"
+          + payload
+        )))
+    for batch, (_, output) in zip(batches, _run_concurrently(prompts, max_concurrent=16)):
+        try:
+            summaries = _parse_doc_map(output)
+        except json.JSONDecodeError:
+            # fall back to showing whatever came back rather than dropping it
+            click.echo(output)
+            continue
+        for name, _ in batch:
+            click.echo(f"--- {name} ---")
+            click.echo(summaries.get(name, "(no summary returned)"))
+
+
+def _quiz_instructions(n):
+    return (
+      f"Create {n} quiz questions (with multiple‑choice options) "
+      f"based on the content, along with an easily formatted answer key."
+      f"\n\nAnswer key format should be:\n"
+      f"1. B) Answer\n"
+    )
 
 
 @cli.command()
 @require_login
 @require_role(['teacher','admin'])
-@click.argument("docname")
-@click.option("--n", default=5, help="Number of quiz questions")
-def quiz(docname, n):
-    """<docname> <num questions> Auto‑generate a quiz"""
-    click.echo(f"Generating {n} quiz questions for {docname}...")
-    client = OpenAI(
-			# This is the default and can be omitted
-			api_key=os.environ.get("OPENAI_API_KEY"),
-		)
-    
-    path = os.path.join(DOCS_DIR, docname)
-    if not os.path.exists(path):
-        click.echo("Document not found.")
+@click.argument("docnames", nargs=-1, required=True)
+@click.option("--n", default=5, help="Number of quiz questions per document")
+@click.option("--batch-size", default=8, help="Documents sent per OpenAI request")
+def quiz(docnames, n, batch_size):
+    """<docnames...> Auto‑generate quizzes. Several documents share one request."""
+    docs = _load_docs(docnames)
+    if docs is None:
         return
-    text = get_text(path)
-    prompt = (
-      f"Create {n} quiz questions (with multiple‑choice options) "
-      f"based on the following content, along with an easily formatted answer key:\n\n{text}"
-      f"\n\nAnswer key format should be:\n"
-      f"1. B) Answer\n"
+
+    if len(docs) == 1:
+        docname, text = docs[0]
+        click.echo(f"Generating {n} quiz questions for {docname}...")
+        chunks = chunk_text(text)
+        if len(chunks) > 1:
+            # document over the prompt budget: spread the n questions
+            # across chunks proportionally to their size and quiz each
+            # chunk concurrently
+            weights = [_token_len(chunk) for chunk in chunks]
+            total_weight = sum(weights)
+            counts = [max(1, round(n * w / total_weight)) for w in weights]
+            prompts = [(str(i), _quiz_instructions(counts[i])
+                        + f"\nContent:\n\n{chunk}")
+                       for i, chunk in enumerate(chunks)]
+            question_parts = []
+            key_parts = []
+            for i, (_, output) in enumerate(_run_concurrently(prompts), start=1):
+                if "Answer Key" in output:
+                    questions, key = output.split("Answer Key", 1)
+                    key_parts.append(f"Part {i}:\n{key.strip()}")
+                else:
+                    questions = output
+                question_parts.append(f"Part {i}:\n{questions.strip()}")
+            combined = "\n\n".join(question_parts)
+            if key_parts:
+                combined += "\n\nAnswer Key\n\n" + "\n\n".join(key_parts)
+            _save_quiz(docname, combined)
+            return
+        client = get_client()
+        prompt = (
+          f"Create {n} quiz questions (with multiple‑choice options) "
+          f"based on the following content, along with an easily formatted answer key:\n\n{text}"
+          f"\n\nAnswer key format should be:\n"
+          f"1. B) Answer\n"
+        )
+        response = client.responses.create(
+				model="gpt-4o-mini",
+				input=prompt,
+				#temperature=0.6,
+				#max_tokens=1500
+			)
+        _save_quiz(docname, response.output_text)
+        return
+
+    click.echo(f"Generating {n} quiz questions for each of {len(docs)} documents...")
+    batches = list(_batched(docs, batch_size))
+    prompts = []
+    for i, batch in enumerate(batches):
+        payload = json.dumps([{"doc_id": name, "text": text} for name, text in batch])
+        prompts.append((str(i), (
+          "For each document in the JSON list below: " + _quiz_instructions(n)
+          + "\nRespond with only a JSON object mapping each \"doc_id\" to its "
+          "quiz (questions followed by the answer key).\n\n" + payload
+        )))
+    for batch, (_, output) in zip(batches, _run_concurrently(prompts, max_concurrent=16)):
+        try:
+            quizzes = _parse_doc_map(output)
+        except json.JSONDecodeError:
+            click.echo(output)
+            continue
+        for name, _ in batch:
+            if name in quizzes:
+                _save_quiz(name, quizzes[name])
+            else:
+                click.echo(f"No quiz returned for {name}.")
+
+
+def _batch_output_text(body):
+    """Collect the output_text pieces from a Batch API response body."""
+    parts = []
+    for item in body.get("output", []):
+        for content in item.get("content", []) or []:
+            if content.get("type") == "output_text":
+                parts.append(content.get("text", ""))
+    return "".join(parts)
+
+
+@cli.command('batch-summarize')
+@require_login
+@click.argument("docnames", nargs=-1, required=True)
+def batch_summarize(docnames):
+    """Submit summaries via the OpenAI Batch API (half price, up to 24h).
+
+    Results are retrieved later with `batch-fetch`.
+    """
+    client = get_client()
+
+    docs = _load_docs(docnames)
+    if docs is None:
+        return
+
+    lines = [json.dumps({
+        "custom_id": name,
+        "method": "POST",
+        "url": "/v1/responses",
+        "body": {"model": "gpt-4o-mini", "input": f"Summarize this:\n\n{text}"},
+    }) for name, text in docs]
+
+    tmp = tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False, encoding='utf-8')
+    try:
+        tmp.write("\n".join(lines) + "\n")
+        tmp.close()
+        with open(tmp.name, 'rb') as f:
+            upload = client.files.create(file=f, purpose="batch")
+        batch = client.batches.create(
+            input_file_id=upload.id,
+            endpoint="/v1/responses",
+            completion_window="24h",
+        )
+    finally:
+        os.unlink(tmp.name)
+
+    conn = get_db_connection()
+    conn.execute(
+        "INSERT INTO batches (batch_id, kind, status, created) VALUES (?, ?, ?, ?)",
+        (batch.id, 'summarize', batch.status, datetime.datetime.utcnow().isoformat())
     )
-    response = client.responses.create(
-			model="gpt-4o-mini",
-			input=prompt,
-			#temperature=0.6,
-			#max_tokens=1500
-		)
-    response_text = response.output_text
-    # Split out questions vs answer key
-    if "Answer Key" in response_text:
-        questions_part, answer_key_part = response_text.split("Answer Key", 1)
-        answer_key_part = "Answer Key" + answer_key_part
-    else:
-        questions_part = response_text
-        answer_key_part = ""
+    click.echo(f"Submitted batch {batch.id} ({len(docs)} documents).")
+    click.echo(f"Fetch results later with: doccli batch-fetch {batch.id}")
 
-    # Write the quiz questions
-    quiz_file = os.path.join(QUIZ_DIR, f"{docname}_quiz.txt")
-    with open(quiz_file, "w", encoding="utf-8") as f:
-        f.write(questions_part.strip())
-        f.write("\n\nAnswer files should be in the format:\nFirst Last, A, B, C, D")
-    click.echo(f"Quiz saved to {quiz_file}")
 
-    # Write the answer key (if present)
-    if answer_key_part:
-        ans_file = os.path.join(ANS_KEY_DIR, f"{docname}_answer_key.txt")
-        with open(ans_file, "w", encoding="utf-8") as f:
-            f.write(answer_key_part.strip())
-        click.echo(f"Answer key saved to {ans_file}")
-    
+@cli.command('batch-fetch')
+@require_login
+@click.argument('batch_id')
+def batch_fetch(batch_id):
+    """Fetch the results of a submitted batch and write them into docs/."""
+    client = get_client()
+
+    batch = client.batches.retrieve(batch_id)
+    conn = get_db_connection()
+    conn.execute("UPDATE batches SET status=? WHERE batch_id=?", (batch.status, batch_id))
+    if batch.status != "completed":
+        click.echo(f"Batch {batch_id} is {batch.status}; try again later.")
+        return
+
+    content = client.files.content(batch.output_file_id)
+    for line in content.text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        name = record.get("custom_id", "unknown")
+        response = record.get("response") or {}
+        if response.get("status_code") != 200:
+            click.echo(f"{name}: request failed ({response.get('status_code')}).")
+            continue
+        out_file = DOCS_DIR / f"{name}_summary.txt"
+        with open(out_file, 'w', encoding='utf-8') as f:
+            f.write(_batch_output_text(response.get("body") or {}))
+        click.echo(f"Wrote {out_file}")
+
+
+@cli.command('summarize-all')
+@require_login
+@click.argument("docnames", nargs=-1, required=True)
+def summarize_all(docnames):
+    """Summarize several documents with concurrent OpenAI calls."""
+    prompts = []
+    for docname in docnames:
+        path = DOCS_DIR / docname
+        if not os.path.exists(path):
+            click.echo(f"Document not found: {docname}. Are you missing .pdf or .txt?")
+            return
+        prompts.append((docname, f"Summarize this:\n\n{get_text(path)}"))
+
+    click.echo(f"Generating {len(prompts)} summaries...")
+    for docname, output in _run_concurrently(prompts):
+        click.echo(f"--- {docname} ---")
+        click.echo(output)
+
+
+@cli.command('quiz-all')
+@require_login
+@require_role(['teacher','admin'])
+@click.argument("docnames", nargs=-1, required=True)
+@click.option("--n", default=5, help="Number of quiz questions per document")
+def quiz_all(docnames, n):
+    """Generate quizzes for several documents with concurrent OpenAI calls."""
+    prompts = []
+    for docname in docnames:
+        path = DOCS_DIR / docname
+        if not os.path.exists(path):
+            click.echo(f"Document not found: {docname}")
+            return
+        text = get_text(path)
+        prompts.append((docname, (
+          f"Create {n} quiz questions (with multiple‑choice options) "
+          f"based on the following content, along with an easily formatted answer key:\n\n{text}"
+          f"\n\nAnswer key format should be:\n"
+          f"1. B) Answer\n"
+        )))
+
+    click.echo(f"Generating quizzes for {len(prompts)} documents...")
+    for docname, output in _run_concurrently(prompts):
+        _save_quiz(docname, output)
+
+
+# Matches answer-key lines like "1. B) Answer" (the question number is
+# optional) and captures the answer letter; anchored so a single .match
+# per line replaces the old split/strip/upper chain.
+_KEY_RE = re.compile(r'^\s*(?:\d+\.\s*)?([A-Za-z])\s*\)')
 
 
 @cli.command()
@@ -410,56 +1085,82 @@ def quiz(docname, n):
 @click.argument("answer_key_file", type=click.STRING)
 def grade(response_file, answer_key_file):
     """<response_file> <answer_key_file> Grade quiz responses against the answer key"""
+    import numpy as np
     click.echo("Grading quiz responses...")
-    # Parse answer key
-    answer_key_file = os.path.join(ANS_KEY_DIR, answer_key_file)
+    # Parse the answer key in one streaming pass: the compiled regex pulls
+    # the letter per line and the 'Answer Key' sentinel toggles which
+    # matches count, so nothing is materialized twice.
+    answer_key_file = ANS_KEY_DIR / answer_key_file
+    correct_all = []     # matches anywhere, used when there is no sentinel
+    correct_key = []     # matches after the sentinel
+    saw_marker = False
     with open(answer_key_file, encoding='utf-8') as f:
-        lines = [line.strip() for line in f if line.strip()]
-    #click.echo(f"lines: {lines}")
-    # Locate 'Answer Key' section
-    if 'Answer Key' in lines:
-        start = lines.index('Answer Key') + 1
-    else:
-        start = 0
-    key_lines = lines[start:]
-    #click.echo(f"key_lines: {key_lines}")
-    correct = []
-    for line in key_lines:
-        if ')' in line:
-            letter = line.split(')')[0].strip()
-            correct.append(letter.upper())
-    # Parse student responses (supports multiple lines)
-    response_file = os.path.join(STUDENT_RESP_DIR, response_file)
-    with open(response_file, encoding='utf-8') as f:
-        resp_lines = [line.strip() for line in f if line.strip()]
-    #click.echo(f"resp_lines: {resp_lines}")
-    for resp in resp_lines:
-        parts = [p.strip() for p in resp.split(',')]
-        student = parts[0]
-        answers = [a.upper() for a in parts[1:]]
-        #click.echo(f"answers: {answers}")
-        total = len(correct)
-        scored = sum(1 for a, k in zip(answers, correct) if a == k[-1])
-        click.echo(f"Student: {student}")
-        click.echo(f"Score: {scored}/{total}")
-        click.echo("Question breakdown:")
-        for idx, (a, k) in enumerate(zip(answers, correct), start=1):
-            if a == k[-1]:
-                status = "Correct"
-            else:
-                status = f"Incorrect (Correct: {k[-1]})"
-            click.echo(f" {idx}. Your: {a} | {status}")
-        click.echo("-" * 40)
+        for line in f:
+            if not saw_marker and 'Answer Key' in line:
+                saw_marker = True
+                continue
+            m = _KEY_RE.match(line)
+            if m:
+                letter = m.group(1).upper()
+                correct_all.append(letter)
+                if saw_marker:
+                    correct_key.append(letter)
+    correct = correct_key if saw_marker else correct_all
+    # Vectorized scoring: correct already holds the bare answer letters, so
+    # the key array and question count are built exactly once here and each
+    # student costs a single C-level array compare.
+    key_arr = np.array(correct, dtype='U1')
+    total = len(key_arr)
+    if total == 0:
+        click.echo("No answers found in the answer key.")
+        return
+    # Stream student responses row by row and accumulate the report,
+    # writing it once at the end: one write() instead of a syscall (and
+    # possible flush) per line.
+    response_file = STUDENT_RESP_DIR / response_file
+    out = []
+    with open(response_file, encoding='utf-8', newline='') as f:
+        for parts in csv.reader(f, skipinitialspace=True):
+            if not parts:
+                continue
+            student = parts[0].strip()
+            answers = [a.strip().upper() for a in parts[1:]]
+            ans_arr = np.array(answers[:total], dtype='U1')
+            key = key_arr[:len(ans_arr)]
+            mask = ans_arr == key
+            scored = int(mask.sum())
+            out.append(f"Student: {student}")
+            out.append(f"Score: {scored}/{total}")
+            wrong = np.nonzero(~mask)[0]
+            if len(wrong):
+                out.append("Incorrect answers:")
+                for idx in wrong:
+                    out.append(f" {idx + 1}. Your: {ans_arr[idx]} | Incorrect (Correct: {key[idx]})")
+            out.append("-" * 40)
+    if out:
+        click.echo("\n".join(out))
 
 
 @cli.command()
 @require_login
-def list_docs():
-    """List uploaded documents"""
-    conn = sqlite3.connect(DB_PATH)
-    for row in conn.execute("SELECT id, name, owner, timestamp, type FROM documents"):
+@click.option("--limit", default=50, help="Maximum number of documents to show")
+@click.option("--offset", default=0, help="Number of documents to skip")
+def list_docs(limit, offset):
+    """List uploaded documents. Teachers see their own uploads; admins and
+    students see everything."""
+    session = load_session()
+    conn = get_db_connection()
+    # filter and paginate inside SQLite so Python never materializes rows
+    # the caller won't see; students need the full reading list, so only
+    # teacher listings are scoped to their own uploads
+    rows = conn.execute(
+        "SELECT id, name, owner, timestamp, type FROM documents "
+        "WHERE ? IN ('admin', 'student') OR owner = ? "
+        "ORDER BY id LIMIT ? OFFSET ?",
+        (session['role'], session['email'], limit, offset)
+    )
+    for row in rows:
         click.echo(f"{row[0]} | {row[1]} | {row[2]} | {row[4]} @ {row[3]}")
-    conn.close()
 
 
 @cli.command('list-quizzes')
@@ -484,7 +1185,7 @@ def read_quiz(quiz_filename):
     Display the contents of a quiz file.
     Pass in the exact filename as listed by `list-quizzes`.
     """
-    path = os.path.join(QUIZ_DIR, quiz_filename)
+    path = QUIZ_DIR / quiz_filename
     if not os.path.exists(path):
         click.echo(f"Quiz file not found: {quiz_filename}")
         return
@@ -512,7 +1213,6 @@ def delete_doc(name):
     row = c.fetchone()
     if not row:
         click.echo(f"No document found with name {name}.")
-        conn.close()
         return
 
     name, owner = row
@@ -520,18 +1220,15 @@ def delete_doc(name):
     # teachers may only delete their own
     if session['role'] == 'teacher' and owner != session['email']:
         click.echo("Permission denied: you can only delete documents you own.")
-        conn.close()
         return
 
     # remove the file if it exists
-    path = os.path.join(DOCS_DIR, name)
+    path = DOCS_DIR / name
     if os.path.exists(path):
         os.remove(path)
 
     # remove the metadata row
     c.execute("DELETE FROM documents WHERE name = ?", (name,))
-    conn.commit()
-    conn.close()
 
     click.echo(f"Deleted document ({name}).")
 
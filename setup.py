@@ -7,7 +7,9 @@ setup(
     install_requires=[
         "click>=8.0",
         "openai",
+        "pypdf",
         "pdfminer.six",
+        "numpy",
     ],
     entry_points={
         "console_scripts": [